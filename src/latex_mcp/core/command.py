@@ -7,8 +7,9 @@
 # @Email  : sepinetam@gmail.com
 # @File   : command.py
 
+import itertools
 import shutil
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from .types import CompilerType
 
@@ -36,9 +37,27 @@ class LaTeXCommand:
         "latexmk": "latexmk",
     }
 
-    # Cache for found commands
-    _cached_compilers: Optional[Dict[CompilerType, Optional[str]]] = None
-    _cached_aux: Optional[Dict[str, Optional[str]]] = None
+    # Flags passed to every compiler and latexmk invocation
+    _COMMON_FLAGS: Tuple[str, ...] = (
+        "-interaction=nonstopmode",
+        "-halt-on-error",
+        "-file-line-error",
+    )
+
+    # latexmk flag selecting each compiler
+    _LATEXMK_FLAG: Dict[CompilerType, str] = {
+        CompilerType.PDFLATEX: "-pdf",
+        CompilerType.XELATEX: "-xelatex",
+        CompilerType.LUALATEX: "-lualatex",
+    }
+
+    # Cache for found commands, keyed on binary name
+    _cmd_cache: Dict[str, Optional[str]] = {}
+
+    # Availability snapshots, rebuilt by _warm()
+    _available_compilers: Tuple[str, ...] = ()
+    _available_aux: Tuple[str, ...] = ()
+    _latexmk_available: bool = False
 
     @classmethod
     def _find_command(cls, command: str) -> Optional[str]:
@@ -54,6 +73,32 @@ class LaTeXCommand:
         path = shutil.which(command)
         return path
 
+    @classmethod
+    def _warm(cls) -> None:
+        """Resolve every known compiler and auxiliary command once."""
+        for command in itertools.chain(
+            cls._COMPILER_PATHS.values(), cls._AUX_COMMANDS.values()
+        ):
+            cls._cmd_cache[command] = cls._find_command(command)
+
+        cls._available_compilers = tuple(
+            compiler.value
+            for compiler, command in cls._COMPILER_PATHS.items()
+            if cls._cmd_cache[command] is not None
+        )
+        cls._available_aux = tuple(
+            name
+            for name, command in cls._AUX_COMMANDS.items()
+            if cls._cmd_cache[command] is not None
+        )
+        cls._latexmk_available = "latexmk" in cls._available_aux
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Clear all cached command lookups and resolve them again (e.g. after PATH changes)."""
+        cls._cmd_cache.clear()
+        cls._warm()
+
     @classmethod
     def get_compiler_path(cls, compiler: CompilerType) -> Optional[str]:
         """
@@ -65,18 +110,7 @@ class LaTeXCommand:
         Returns:
             Full path to compiler or None if not found.
         """
-        if cls._cached_compilers is None:
-            cls._cache_compilers()
-
-        return cls._cached_compilers.get(compiler)
-
-    @classmethod
-    def _cache_compilers(cls) -> None:
-        """Cache compiler paths."""
-        cls._cached_compilers = {}
-        for compiler_type, command in cls._COMPILER_PATHS.items():
-            path = cls._find_command(command)
-            cls._cached_compilers[compiler_type] = path
+        return cls._cmd_cache.get(cls._COMPILER_PATHS[compiler])
 
     @classmethod
     def get_aux_command(cls, name: str) -> Optional[str]:
@@ -89,18 +123,11 @@ class LaTeXCommand:
         Returns:
             Full path to command or None if not found.
         """
-        if cls._cached_aux is None:
-            cls._cache_aux_commands()
+        command = cls._AUX_COMMANDS.get(name)
+        if command is None:
+            return None
 
-        return cls._cached_aux.get(name)
-
-    @classmethod
-    def _cache_aux_commands(cls) -> None:
-        """Cache auxiliary command paths."""
-        cls._cached_aux = {}
-        for name, command in cls._AUX_COMMANDS.items():
-            path = cls._find_command(command)
-            cls._cached_aux[name] = path
+        return cls._cmd_cache.get(command)
 
     @classmethod
     def list_available_compilers(cls) -> List[str]:
@@ -110,14 +137,7 @@ class LaTeXCommand:
         Returns:
             List of available compiler names.
         """
-        if cls._cached_compilers is None:
-            cls._cache_compilers()
-
-        return [
-            compiler.value
-            for compiler, path in cls._cached_compilers.items()
-            if path is not None
-        ]
+        return list(cls._available_compilers)
 
     @classmethod
     def list_available_aux_commands(cls) -> List[str]:
@@ -127,14 +147,7 @@ class LaTeXCommand:
         Returns:
             List of available auxiliary command names.
         """
-        if cls._cached_aux is None:
-            cls._cache_aux_commands()
-
-        return [
-            name
-            for name, path in cls._cached_aux.items()
-            if path is not None
-        ]
+        return list(cls._available_aux)
 
     @classmethod
     def is_latexmk_available(cls) -> bool:
@@ -144,7 +157,7 @@ class LaTeXCommand:
         Returns:
             True if latexmk is available.
         """
-        return cls.get_aux_command("latexmk") is not None
+        return cls._latexmk_available
 
     @classmethod
     def build_compile_command(
@@ -168,12 +181,7 @@ class LaTeXCommand:
         if compiler_path is None:
             raise ValueError(f"Compiler {compiler.value} not found")
 
-        cmd = [
-            compiler_path,
-            "-interaction=nonstopmode",
-            "-halt-on-error",
-            "-file-line-error",
-        ]
+        cmd = [compiler_path, *cls._COMMON_FLAGS]
 
         if options:
             cmd.extend(options)
@@ -204,28 +212,7 @@ class LaTeXCommand:
         if latexmk_path is None:
             raise ValueError("latexmk not found")
 
-        # Map compiler to latexmk flag
-        pdf_flag = {
-            CompilerType.PDFLATEX: "-pdf",
-            CompilerType.XELATEX: "-xelatex",
-            CompilerType.LUALATEX: "-lualatex",
-        }
-
-        cmd = [
-            latexmk_path,
-            pdf_flag.get(compiler, "-pdf"),
-            "-interaction=nonstopmode",
-            "-halt-on-error",
-            "-file-line-error",
-        ]
-
-        # Set the specific compiler if not pdflatex
-        if compiler == CompilerType.PDFLATEX:
-            pass  # Default, no need to specify
-        elif compiler == CompilerType.XELATEX:
-            cmd.append("-xelatex")
-        elif compiler == CompilerType.LUALATEX:
-            cmd.append("-lualatex")
+        cmd = [latexmk_path, cls._LATEXMK_FLAG[compiler], *cls._COMMON_FLAGS]
 
         if options:
             cmd.extend(options)
@@ -267,3 +254,7 @@ class LaTeXCommand:
             raise ValueError("latexmk not found")
 
         return [latexmk_path, "-c", tex_file]
+
+
+# Resolve commands once at import, off the request path
+LaTeXCommand._warm()
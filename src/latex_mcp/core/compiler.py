@@ -8,16 +8,25 @@
 # @File   : compiler.py
 
 import asyncio
-import glob
 import os
 import re
+import subprocess
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from .command import LaTeXCommand
 from .types import CleanInput, CleanResult, CompileInput, CompileMode, CompileResult
 
 
+@dataclass(frozen=True)
+class _CompileCtx:
+    """Values derived once from CompileInput and shared by a compile run."""
+    params: CompileInput
+    tex_stem: str
+    pdf_name: str
+
+
 class LaTeXCompiler:
     """
     LaTeX compiler implementation.
@@ -33,6 +42,23 @@ class LaTeXCompiler:
         ".ind", ".glo", ".gls", ".acn", ".acr", ".ist",
         ".bcf", ".run.xml", ".xdv", ".synctex.gz",
     ]
+    _AUX_EXT_SET = frozenset(AUX_EXTENSIONS)
+    _AUX_EXT_TUPLE = tuple(AUX_EXTENSIONS)
+
+    # Max line length buffered when streaming compiler output
+    _STREAM_LIMIT = 1024 * 1024
+
+    # Log lines reporting an error: "! ...", "l.<n> ...", or "...Error: ..."
+    _ERROR_RE = re.compile(
+        rb"^(?:! .+|l\.\d+ .+|.*?Error: .+)$",
+        re.MULTILINE,
+    )
+
+    # Log lines reporting a warning (covers LaTeX and package warnings)
+    _WARNING_RE = re.compile(
+        rb"^.*?(?:Warning: .|Overfull \\hbox|Underfull \\hbox).*$",
+        re.MULTILINE,
+    )
 
     @classmethod
     async def compile(cls, params: CompileInput) -> CompileResult:
@@ -61,28 +87,48 @@ class LaTeXCompiler:
                 errors=[f"TeX file does not exist: {params.tex_file}"],
             )
 
+        tex_stem = Path(params.tex_file).stem
+        ctx = _CompileCtx(
+            params=params,
+            tex_stem=tex_stem,
+            pdf_name=f"{tex_stem}.pdf",
+        )
+
         # Choose compilation mode
         if params.mode == CompileMode.AUTO:
-            return await cls._compile_auto(params)
+            return await cls._compile_auto(ctx)
+        elif (
+            params.compile_times > 1
+            and not params.options
+            and LaTeXCommand.is_latexmk_available()
+        ):
+            # Let latexmk drive the passes instead of spawning one run per pass;
+            # compiler options are not latexmk options, so those stay manual
+            return await cls._compile_auto(ctx, force=True)
         else:
-            return await cls._compile_manual(params)
+            return await cls._compile_manual(ctx)
 
     @classmethod
-    async def _compile_auto(cls, params: CompileInput) -> CompileResult:
+    async def _compile_auto(
+        cls, ctx: _CompileCtx, force: bool = False
+    ) -> CompileResult:
         """
         Compile using latexmk (automatic mode).
 
         Args:
-            params: Compilation parameters.
+            ctx: Compilation context.
+            force: Pass -g so latexmk rebuilds even if outputs look up to date.
 
         Returns:
             CompileResult with compilation results.
         """
+        params = ctx.params
+        options = ["-g", *params.options] if force else params.options
         try:
             cmd = LaTeXCommand.build_latexmk_command(
                 compiler=params.compiler,
                 tex_file=params.tex_file,
-                options=params.options,
+                options=options,
             )
         except ValueError as e:
             return CompileResult(
@@ -90,23 +136,23 @@ class LaTeXCompiler:
                 errors=[str(e)],
             )
 
-        # Run compilation
-        process, stdout, stderr = await cls._run_command(
-            cmd, params.working_dir
-        )
-
-        # Parse output
+        # Run compilation, parsing output as it arrives
+        try:
+            returncode, stdout, _, errors, warnings = await cls._run_command_streaming(
+                cmd, params.working_dir
+            )
+        except (OSError, ValueError) as e:
+            return CompileResult(
+                success=False,
+                errors=[f"Failed to run {cmd[0]}: {e}"],
+            )
         log = stdout.decode("utf-8", errors="replace")
-        errors, warnings = cls._parse_log(log)
 
         # Check for success
-        success = process.returncode == 0
+        success = returncode == 0
 
         # Determine PDF path
-        pdf_path = None
-        if success:
-            tex_stem = Path(params.tex_file).stem
-            pdf_path = f"{tex_stem}.pdf"
+        pdf_path = ctx.pdf_name if success else None
 
         # Clean if requested
         if params.clean_after and success:
@@ -116,21 +162,23 @@ class LaTeXCompiler:
             success=success,
             pdf_path=pdf_path,
             log=log,
-            errors=errors,
-            warnings=warnings,
+            # latexmk repeats diagnostics on every pass it runs
+            errors=list(dict.fromkeys(errors)),
+            warnings=list(dict.fromkeys(warnings)),
         )
 
     @classmethod
-    async def _compile_manual(cls, params: CompileInput) -> CompileResult:
+    async def _compile_manual(cls, ctx: _CompileCtx) -> CompileResult:
         """
         Compile using manual compilation chain.
 
         Args:
-            params: Compilation parameters.
+            ctx: Compilation context.
 
         Returns:
             CompileResult with compilation results.
         """
+        params = ctx.params
         try:
             cmd = LaTeXCommand.build_compile_command(
                 compiler=params.compiler,
@@ -144,37 +192,38 @@ class LaTeXCompiler:
             )
 
         all_log = []
-        all_errors = []
-        all_warnings = []
+        # Insertion-ordered sets, so repeated diagnostics keep first-seen order
+        seen_err: Dict[str, None] = {}
+        seen_warn: Dict[str, None] = {}
 
         # Run multiple compilation passes
         for i in range(params.compile_times):
-            process, stdout, stderr = await cls._run_command(
-                cmd, params.working_dir
-            )
-
+            try:
+                returncode, stdout, _, errors, warnings = await cls._run_command_streaming(
+                    cmd, params.working_dir
+                )
+            except (OSError, ValueError) as e:
+                seen_err[f"Failed to run {cmd[0]}: {e}"] = None
+                returncode = -1
+                break
             log = stdout.decode("utf-8", errors="replace")
             all_log.append(f"--- Pass {i + 1} ---\n{log}")
 
-            errors, warnings = cls._parse_log(log)
-            all_errors.extend(errors)
-            all_warnings.extend(warnings)
+            seen_err.update(dict.fromkeys(errors))
+            seen_warn.update(dict.fromkeys(warnings))
 
             # Run bibtex on first pass if bibliography specified
             if i == 0 and params.bibliography:
-                await cls._run_bibtex(params)
+                await cls._run_bibtex(ctx)
 
             # If compilation failed, stop
-            if process.returncode != 0:
+            if returncode != 0:
                 break
 
-        success = process.returncode == 0
+        success = returncode == 0
 
         # Determine PDF path
-        pdf_path = None
-        if success:
-            tex_stem = Path(params.tex_file).stem
-            pdf_path = f"{tex_stem}.pdf"
+        pdf_path = ctx.pdf_name if success else None
 
         # Clean if requested
         if params.clean_after and success:
@@ -184,98 +233,127 @@ class LaTeXCompiler:
             success=success,
             pdf_path=pdf_path,
             log="\n".join(all_log),
-            errors=list(set(all_errors)),  # Deduplicate
-            warnings=list(set(all_warnings)),
+            errors=list(seen_err),
+            warnings=list(seen_warn),
         )
 
     @classmethod
-    async def _run_bibtex(cls, params: CompileInput) -> Tuple[int, bytes, bytes]:
+    async def _run_bibtex(cls, ctx: _CompileCtx) -> Tuple[int, bytes, bytes]:
         """
         Run bibtex for bibliography processing.
 
         Args:
-            params: Compilation parameters.
+            ctx: Compilation context.
 
         Returns:
             Tuple of (return_code, stdout, stderr).
         """
-        tex_stem = Path(params.tex_file).stem
         try:
-            cmd = LaTeXCommand.build_bibtex_command(tex_stem)
-            return await cls._run_command(cmd, params.working_dir)
+            cmd = LaTeXCommand.build_bibtex_command(ctx.tex_stem)
         except ValueError:
             # bibtex not available, skip
             return (0, b"", b"")
 
+        # bibtex is short-lived, so run it in a thread rather than
+        # through the event loop's subprocess machinery
+        return await asyncio.to_thread(
+            cls._run_command_sync, cmd, ctx.params.working_dir
+        )
+
     @classmethod
-    async def _run_command(
+    async def _run_command_streaming(
         cls, cmd: List[str], cwd: str
-    ) -> Tuple[asyncio.subprocess.Process, bytes, bytes]:
+    ) -> Tuple[int, bytes, bytes, List[str], List[str]]:
         """
-        Run a command asynchronously.
+        Run a command asynchronously, scanning stdout while it runs.
 
         Args:
             cmd: Command and arguments.
             cwd: Working directory.
 
         Returns:
-            Tuple of (process, stdout, stderr).
+            Tuple of (return_code, stdout, stderr, errors, warnings).
         """
         process = await asyncio.create_subprocess_exec(
             *cmd,
             cwd=cwd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            limit=cls._STREAM_LIMIT,
         )
-        stdout, stderr = await process.communicate()
-        return process, stdout, stderr
+        try:
+            (stdout, errors, warnings), stderr, returncode = await asyncio.gather(
+                cls._read_and_scan(process.stdout),
+                process.stderr.read(),
+                process.wait(),
+            )
+        except BaseException:
+            # Don't leave the child running with nobody draining its pipes
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+            raise
+        return returncode, stdout, stderr, errors, warnings
 
     @classmethod
-    def _parse_log(cls, log: str) -> Tuple[List[str], List[str]]:
+    async def _read_and_scan(
+        cls, stream: asyncio.StreamReader
+    ) -> Tuple[bytes, List[str], List[str]]:
         """
-        Parse LaTeX log for errors and warnings.
+        Read a stream line by line, collecting errors and warnings.
 
         Args:
-            log: Compilation log text.
+            stream: Process stdout reader.
 
         Returns:
-            Tuple of (errors, warnings).
+            Tuple of (output, errors, warnings).
         """
+        # Scan raw bytes; only matched lines are decoded individually
+        buf = bytearray()
         errors = []
         warnings = []
-
-        # Error patterns
-        error_patterns = [
-            r"^! (.+)$",
-            r"^l\.(\d+) (.+)$",
-            r"Error: (.+)",
-        ]
-
-        # Warning patterns
-        warning_patterns = [
-            r"Warning: (.+)",
-            r"LaTeX Warning: (.+)",
-            r"Package (\w+) Warning: (.+)",
-            r"Overfull \\hbox",
-            r"Underfull \\hbox",
-        ]
-
-        lines = log.split("\n")
-        for line in lines:
-            # Check for errors
-            for pattern in error_patterns:
-                match = re.search(pattern, line)
-                if match:
-                    errors.append(line.strip())
+        while True:
+            try:
+                raw_line = await stream.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                # EOF: whatever is left is the final, unterminated line
+                raw_line = e.partial
+                if not raw_line:
                     break
+            except asyncio.LimitOverrunError as e:
+                # Over-long line: take the buffered chunk as-is
+                raw_line = await stream.read(e.consumed)
 
-            # Check for warnings
-            for pattern in warning_patterns:
-                if re.search(pattern, line):
-                    warnings.append(line.strip())
-                    break
+            buf += raw_line
+            if cls._ERROR_RE.search(raw_line):
+                errors.append(raw_line.decode("utf-8", "replace").strip())
+            if cls._WARNING_RE.search(raw_line):
+                warnings.append(raw_line.decode("utf-8", "replace").strip())
 
-        return errors, warnings
+        return bytes(buf), errors, warnings
+
+    @classmethod
+    def _run_command_sync(
+        cls, cmd: List[str], cwd: str
+    ) -> Tuple[int, bytes, bytes]:
+        """
+        Run a command synchronously.
+
+        Args:
+            cmd: Command and arguments.
+            cwd: Working directory.
+
+        Returns:
+            Tuple of (return_code, stdout, stderr).
+        """
+        completed = subprocess.run(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        return completed.returncode, completed.stdout, completed.stderr
 
     @classmethod
     async def clean(cls, params: CleanInput) -> CleanResult:
@@ -308,6 +386,24 @@ class LaTeXCompiler:
     @classmethod
     async def _clean_aux_files(
         cls, working_dir: str, tex_file: str = None
+    ) -> List[str]:
+        """
+        Remove auxiliary files without blocking the event loop.
+
+        Args:
+            working_dir: Working directory.
+            tex_file: Specific tex file (optional).
+
+        Returns:
+            List of removed file paths.
+        """
+        return await asyncio.to_thread(
+            cls._clean_aux_files_sync, working_dir, tex_file
+        )
+
+    @classmethod
+    def _clean_aux_files_sync(
+        cls, working_dir: str, tex_file: str = None
     ) -> List[str]:
         """
         Remove auxiliary files.
@@ -320,28 +416,35 @@ class LaTeXCompiler:
             List of removed file paths.
         """
         removed = []
-        base_path = Path(working_dir)
-
+        stem = None
         if tex_file:
-            # Clean for specific file
-            stem = Path(tex_file).stem
-            for ext in cls.AUX_EXTENSIONS:
-                pattern = str(base_path / f"{stem}{ext}")
-                for file_path in glob.glob(pattern):
-                    try:
-                        os.remove(file_path)
-                        removed.append(file_path)
-                    except OSError:
-                        pass
-        else:
-            # Clean all auxiliary files in directory
-            for ext in cls.AUX_EXTENSIONS:
-                pattern = str(base_path / f"*{ext}")
-                for file_path in glob.glob(pattern):
-                    try:
-                        os.remove(file_path)
-                        removed.append(file_path)
-                    except OSError:
-                        pass
+            stem, _ = os.path.splitext(os.path.basename(tex_file))
+
+        # Single directory pass instead of one glob per extension
+        try:
+            it = os.scandir(working_dir)
+        except OSError:
+            # Not a readable directory: nothing to match, as with glob
+            return removed
+
+        with it:
+            for entry in it:
+                name = entry.name
+                if stem is None:
+                    # "*.ext" globs never matched dotfiles
+                    if name.startswith(".") or not name.endswith(cls._AUX_EXT_TUPLE):
+                        continue
+                elif not (
+                    name.startswith(stem)
+                    and name[len(stem):] in cls._AUX_EXT_SET
+                ):
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    os.unlink(entry.path)
+                    removed.append(entry.path)
+                except OSError:
+                    pass
 
         return removed
@@ -40,7 +40,6 @@ class CompileInput(BaseModel):
     """Input parameters for LaTeX compilation."""
     model_config = ConfigDict(
         str_strip_whitespace=True,
-        validate_assignment=True,
     )
 
     tex_file: str = Field(
@@ -66,7 +65,11 @@ class CompileInput(BaseModel):
     )
     compile_times: int = Field(
         default=2,
-        description="Number of compilation passes (1-5), only used in manual mode",
+        description=(
+            "Number of compilation passes (1-5), only used in manual mode. "
+            "With no options and latexmk available, values above 1 hand the "
+            "build to latexmk and the exact count is ignored"
+        ),
         ge=1,
         le=5,
     )
@@ -110,10 +113,6 @@ class CompileInput(BaseModel):
 
 class CompileResult(BaseModel):
     """Result of LaTeX compilation."""
-    model_config = ConfigDict(
-        validate_assignment=True,
-    )
-
     success: bool = Field(
         ...,
         description="Whether compilation succeeded",
@@ -140,7 +139,6 @@ class CleanInput(BaseModel):
     """Input parameters for cleaning auxiliary files."""
     model_config = ConfigDict(
         str_strip_whitespace=True,
-        validate_assignment=True,
     )
 
     working_dir: str = Field(
@@ -163,10 +161,6 @@ class CleanInput(BaseModel):
 
 class CleanResult(BaseModel):
     """Result of cleaning auxiliary files."""
-    model_config = ConfigDict(
-        validate_assignment=True,
-    )
-
     success: bool = Field(
         ...,
         description="Whether cleaning succeeded",
@@ -43,7 +43,9 @@ async def latex_compile(
         compiler: LaTeX compiler to use - 'pdflatex', 'xelatex', or 'lualatex'
         working_dir: Working directory for compilation
         bibliography: Path to .bib file (only used in manual mode)
-        compile_times: Number of compilation passes, 1-5 (only used in manual mode)
+        compile_times: Number of compilation passes, 1-5 (only used in manual mode;
+                       with no options and latexmk available, more than one pass
+                       is handed to latexmk, which picks the pass count itself)
         options: Additional compiler options
         clean_after: Whether to clean auxiliary files after compilation
 
@@ -58,7 +60,7 @@ async def latex_compile(
         return json.dumps({
             "success": False,
             "errors": [f"Invalid parameter: {e}"],
-        }, indent=2)
+        }, ensure_ascii=False, separators=(",", ":"))
 
     params = CompileInput(
         tex_file=tex_file,
@@ -81,7 +83,7 @@ async def latex_compile(
         "warnings": result.warnings,
     }
 
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return json.dumps(response, ensure_ascii=False, separators=(",", ":"))
 
 
 @latex_mcp.tool(
@@ -104,7 +106,7 @@ async def latex_list_compilers() -> str:
         "latexmk_available": latexmk_available,
     }
 
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return json.dumps(response, ensure_ascii=False, separators=(",", ":"))
 
 
 @latex_mcp.tool(
@@ -138,7 +140,7 @@ async def latex_clean(
         "message": result.message,
     }
 
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return json.dumps(response, ensure_ascii=False, separators=(",", ":"))
 
 
 if __name__ == "__main__":